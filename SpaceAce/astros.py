@@ -1,12 +1,17 @@
 import os
 import time
+import asyncio
 import logging
-import requests
-from langchain.tools import Tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
+import functools
+import httpx
+from langchain.tools import StructuredTool
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from dotenv import load_dotenv
+from http_client import client, get_with_retry
+from cache import ttl_cache
+from llm import llm
+from streaming import astream_answer
 
 # Load environment variables
 load_dotenv()
@@ -20,102 +25,102 @@ logging.basicConfig(level=logging.INFO)
 # API URL for astros location
 ASTROS_API_URL = "http://api.open-notify.org/astros.json"
 
+# Max concurrent requests to open-notify - stays under its rate limits
+_ASTROS_SEM = asyncio.Semaphore(4)
+
+# Cache lifetime in seconds - crew changes are rare
+ASTROS_CACHE_TTL = 600
+
 # astros Locator class
 class Astros:
     def __init__(self):
         self.api_url = ASTROS_API_URL
 
-    def get_astros(self):
+    @ttl_cache(ttl=ASTROS_CACHE_TTL, key=lambda self: self.api_url)
+    async def get_astros(self):
         """
         Fetches the people in space and what spacecraft they are on with retries.
         """
-        retries = 3  # Number of retries
-        for attempt in range(retries):
-            try:
-                response = requests.get(self.api_url, timeout=5)  # Add timeout
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                logging.error(f"GET request failed (Attempt {attempt+1}): {e}")
-                time.sleep(2)  # Wait before retrying
-        return {"error": "Failed to fetch Astros after multiple attempts."}
+        try:
+            return await get_with_retry(client, self.api_url, semaphore=_ASTROS_SEM)
+        except httpx.HTTPError:
+            return {"error": "Failed to fetch Astros after multiple attempts."}
 
 # Define a function for the Tool
-def get_astros(_input):
+async def get_astros():
     """
     Wrapper function for fetching humans in space and their spacecraft.
     """
     locator = Astros()
-    return locator.get_astros()
+    return await locator.get_astros()
 
 # Define the LangChain tool
-get_astros_tool = Tool(
+get_astros_tool = StructuredTool.from_function(
     name="get_astros_tool",
     description="Fetches the current humans in space and the spacecraft they are on.",
-    func=get_astros
+    coroutine=get_astros
 )
 
-# Define LLM with GPT-4o and low temperature
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
-
 # Define available tools
 tools = [get_astros_tool]
 
-tool_names = ", ".join([tool.name for tool in tools])
+# ✅ Define Prompt Template - the static instructions are one leading system message
+astros_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are tracking the astronauts in space along with the spacecraft they are on. Your job is to provide the information about the humans in space.
 
-tool_descriptions = "\n".join([f"{tool.name}: {tool.description}" for tool in tools])
+    Call get_astros_tool (it takes no input) to get the current crew list, then answer the user from its result.
+    For example, if the tool returns Oleg Kononenko on the ISS, answer: Oleg Kononenko is in space right now, aboard the ISS.
+    """),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad")
+])
 
-# ✅ Define Prompt Template with agent_scratchpad as a variable
-astros_prompt = PromptTemplate(
-    input_variables=["input", "agent_scratchpad"],
-    template="""
-    You are tracking the astronauts in space along with the spacecraft they are on. Your job is to provide the information about the humans in space.
+@functools.lru_cache(maxsize=None)
+def build_executor(verbose=False):
+    """
+    Builds the tool-calling agent and its executor once per `verbose` setting; later calls return the cached executor.
+    """
+    # Create the Tool-Calling Agent (the model returns structured tool_calls, no ReAct text to parse)
+    agent = create_openai_tools_agent(llm=llm, tools=tools, prompt=astros_prompt)
+
+    # Define the Agent Executor
+    agent_executor = AgentExecutor(
+        agent=agent,
+        tools=tools,
+        max_iterations=5,
+        max_execution_time=30,
+        verbose=verbose
+    )
+
+    # Log agent initialization
+    logging.info("🚀 Astros in Space Agent initialized.")
+    return agent_executor
 
-    **FORMAT:**  
-    Thought: [Your reasoning]  
-    Action: get_astros_tool  
-    Action Input: {{}}  
-    Observation: [Result]  
-    Final Answer: [Answer to the User]  
-
-    **Example Query:**
-    - Who is in space right now?  
-      Thought: I need to find the who is in space.  
-      Action: get_astros_tool  
-      Action Input: {{}}  
-      Observation: Oleg Kononenko
-      Final Answer: Oleg Kononenko is in space right now.  
-
-    **Begin!**
-    
-    Question: {input}
-    
-    {agent_scratchpad}
+# Example execution
+# Independent example queries - answered concurrently to show the gather speedup
+EXAMPLE_QUERIES = [
+    "Who is in space right now?",
+    "Which spacecraft are the astronauts on?",
+    "How many people are in space?"
+]
+
+async def main():
     """
-)
+    Streams the first example answer, then runs the remaining example queries concurrently in one event loop.
+    """
+    agent_executor = build_executor()
 
-# Create the ReAct Agent
-agent = create_react_agent(
-    llm=llm,
-    tools=tools,
-    prompt=astros_prompt.partial(tool_names=tool_names, tools=tool_descriptions)
-)
+    # Stream the first answer so progress shows while the HTTP calls are in flight
+    await astream_answer(agent_executor, EXAMPLE_QUERIES[0])
 
-# Define the Agent Executor
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    handle_parsing_errors=True,
-    verbose=True,
-    max_iterations=5,
-    max_execution_time=30
-)
+    start = time.perf_counter()
+    batch = EXAMPLE_QUERIES[1:]  # The first query was already answered above
+    responses = await asyncio.gather(*(agent_executor.ainvoke({"input": query}) for query in batch))
+    logging.info(f"⏱️ Answered {len(batch)} queries concurrently in {time.perf_counter() - start:.2f}s")
 
-# Log agent initialization
-logging.info("🚀 Astros in Space Agent initialized.")
+    for response in responses:
+        print("Agent Response:", response)
 
-# Example execution
 if __name__ == "__main__":
-    query = "Who is in space right now?"
-    response = agent_executor.invoke({"input": query})
-    print("Agent Response:", response)
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import time
+import functools
+
+
+def ttl_cache(ttl, key, maxsize=1024):
+    """
+    Caches an async function's result in memory for a short time.
+    `key(*args, **kwargs)` builds the cache key; `ttl` is a number of seconds or a callable taking the same arguments.
+    Error results ({"error": ...}) are never cached so the next call retries upstream.
+    """
+    def decorator(func):
+        store = {}  # cache key -> (value, expiry)
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            cache_key = key(*args, **kwargs)
+            now = time.monotonic()
+
+            hit = store.get(cache_key)
+            if hit and hit[1] > now:
+                return hit[0]
+
+            value = await func(*args, **kwargs)
+            if isinstance(value, dict) and "error" in value:
+                return value
+
+            if len(store) >= maxsize:
+                # Drop expired entries first, then the oldest insert if still full
+                for stale_key in [k for k, (_, expiry) in store.items() if expiry <= now]:
+                    del store[stale_key]
+                if len(store) >= maxsize:
+                    del store[next(iter(store))]
+
+            seconds = ttl(*args, **kwargs) if callable(ttl) else ttl
+            store[cache_key] = (value, now + seconds)
+            return value
+
+        return wrapper
+    return decorator
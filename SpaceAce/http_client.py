@@ -0,0 +1,106 @@
+import asyncio
+import atexit
+import contextlib
+import random
+import logging
+import threading
+import httpx
+import orjson
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+
+# Shared async HTTP client - one keep-alive pool reused by every agent.
+# HTTP/2 multiplexes concurrent WeatherAPI calls over a single TLS connection
+# (plain-http open-notify requests stay on HTTP/1.1 keep-alive).
+client = httpx.AsyncClient(
+    http2=True,
+    timeout=httpx.Timeout(5.0, connect=2.0),
+    limits=httpx.Limits(max_connections=32, max_keepalive_connections=16, keepalive_expiry=60)
+)
+
+# Long-lived background event loop so synchronous callers (e.g. Streamlit reruns)
+# keep reusing the same loop and therefore the same pooled connections
+_loop = asyncio.new_event_loop()
+threading.Thread(target=_loop.run_forever, daemon=True).start()
+
+
+def run(coro):
+    """
+    Runs a coroutine on the shared background event loop and blocks until it completes.
+    """
+    return asyncio.run_coroutine_threadsafe(coro, _loop).result()
+
+
+async def get_with_retry(client, url, params=None, semaphore=None, retries=3, base_delay=0.1, max_delay=5.0):
+    """
+    GETs a URL and returns the decoded JSON, retrying transient failures with exponential backoff and jitter.
+    A numeric Retry-After header is waited out in full, or fails immediately if it is longer than max_delay.
+    Only timeouts, connection errors, 408, 429 and 5xx are retried; other 4xx responses fail immediately.
+    If a semaphore is given it caps in-flight requests; it is held per attempt, never while backing off.
+    A 200 response that is not valid JSON is retried and finally raised as httpx.DecodingError.
+    Raises the last httpx.HTTPError once retries are exhausted.
+    """
+    for attempt in range(retries):
+        try:
+            async with semaphore or contextlib.nullcontext():
+                response = await client.get(url, params=params)
+            logging.debug(f"{response.request.url.host} answered over {response.http_version}")
+            response.raise_for_status()
+            try:
+                return orjson.loads(response.content)  # Faster than the stdlib decoder behind response.json()
+            except orjson.JSONDecodeError as e:
+                # e.g. an HTML error page served with 200 - surface it as an httpx error so callers handle it
+                raise httpx.DecodingError(f"Invalid JSON from {url}: {e}", request=response.request) from e
+        except httpx.DecodingError as e:
+            logging.error(f"GET request failed (Attempt {attempt+1}): {e}")
+            if attempt == retries - 1:
+                raise
+            delay = None
+        except httpx.HTTPStatusError as e:
+            logging.error(f"GET request failed (Attempt {attempt+1}): {e}")
+            if not _is_transient(e.response.status_code) or attempt == retries - 1:
+                raise
+            delay = _retry_after(e.response)
+            if delay is not None and delay > max_delay:
+                # Retrying before the server's Retry-After would only earn another 429 - give up now
+                logging.error(f"Retry-After of {delay}s exceeds the {max_delay}s limit, not retrying")
+                raise
+        except httpx.TransportError as e:
+            logging.error(f"GET request failed (Attempt {attempt+1}): {e}")
+            if attempt == retries - 1:
+                raise
+            delay = None
+
+        if delay is None:
+            delay = min(max_delay, base_delay * 2 ** attempt) * (0.5 + random.random() * 0.5)
+        await asyncio.sleep(delay)
+
+
+def _is_transient(status_code):
+    """
+    Returns True for HTTP status codes worth retrying.
+    """
+    return status_code in (408, 429) or status_code >= 500
+
+
+def _retry_after(response):
+    """
+    Returns the Retry-After header in seconds, or None if it is missing or not a number.
+    """
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+@atexit.register
+def _close_client():
+    """
+    Closes the shared client's keep-alive connections on interpreter exit.
+    """
+    try:
+        run(client.aclose())
+    except RuntimeError:
+        # Connections opened under asyncio.run() belong to a loop that is already closed
+        pass
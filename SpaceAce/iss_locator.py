@@ -1,12 +1,17 @@
 import os
 import time
+import asyncio
 import logging
-import requests
-from langchain.tools import Tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
+import functools
+import httpx
+from langchain.tools import StructuredTool
+from langchain.agents import AgentExecutor, create_openai_tools_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from dotenv import load_dotenv
+from http_client import client, get_with_retry
+from cache import ttl_cache
+from llm import llm
+from streaming import astream_answer
 
 # Load environment variables
 load_dotenv()
@@ -20,102 +25,102 @@ logging.basicConfig(level=logging.INFO)
 # API URL for ISS location
 ISS_API_URL = "http://api.open-notify.org/iss-now.json"
 
+# Max concurrent requests to open-notify - stays under its rate limits
+_ISS_SEM = asyncio.Semaphore(4)
+
+# Cache lifetime in seconds - the position changes every few seconds
+ISS_CACHE_TTL = 3
+
 # ISS Locator class
 class ISSLocator:
     def __init__(self):
         self.api_url = ISS_API_URL
 
-    def get_location(self):
+    @ttl_cache(ttl=ISS_CACHE_TTL, key=lambda self: self.api_url)
+    async def get_location(self):
         """
         Fetches the ISS current location with retries.
         """
-        retries = 3  # Number of retries
-        for attempt in range(retries):
-            try:
-                response = requests.get(self.api_url, timeout=5)  # Add timeout
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                logging.error(f"GET request failed (Attempt {attempt+1}): {e}")
-                time.sleep(2)  # Wait before retrying
-        return {"error": "Failed to fetch ISS location after multiple attempts."}
+        try:
+            return await get_with_retry(client, self.api_url, semaphore=_ISS_SEM)
+        except httpx.HTTPError:
+            return {"error": "Failed to fetch ISS location after multiple attempts."}
 
 # Define a function for the Tool
-def get_iss_location(_input):
+async def get_iss_location():
     """
     Wrapper function for fetching ISS location.
     """
     locator = ISSLocator()
-    return locator.get_location()
+    return await locator.get_location()
 
 # Define the LangChain tool
-get_iss_location_tool = Tool(
+get_iss_location_tool = StructuredTool.from_function(
     name="get_iss_location_tool",
     description="Fetches the International Space Station's current location.",
-    func=get_iss_location
+    coroutine=get_iss_location
 )
 
-# Define LLM with GPT-4o and low temperature
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
-
 # Define available tools
 tools = [get_iss_location_tool]
 
-tool_names = ", ".join([tool.name for tool in tools])
+# ✅ Define Prompt Template - the static instructions are one leading system message
+iss_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
+    You are an International Space Station (ISS) Tracking Agent. Your job is to provide the current location of the ISS when asked.
 
-tool_descriptions = "\n".join([f"{tool.name}: {tool.description}" for tool in tools])
+    Call get_iss_location_tool (it takes no input) to get the current position, then answer the user from its result.
+    For example, if the tool returns latitude 23.5 and longitude -45.3, answer: The ISS is currently at latitude 23.5 and longitude -45.3.
+    """),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad")
+])
 
-# ✅ Define Prompt Template with agent_scratchpad as a variable
-iss_prompt = PromptTemplate(
-    input_variables=["input", "agent_scratchpad"],
-    template="""
-    You are an International Space Station (ISS) Tracking Agent. Your job is to provide the current location of the ISS when asked.
+@functools.lru_cache(maxsize=None)
+def build_executor(verbose=False):
+    """
+    Builds the tool-calling agent and its executor once per `verbose` setting; later calls return the cached executor.
+    """
+    # Create the Tool-Calling Agent (the model returns structured tool_calls, no ReAct text to parse)
+    agent = create_openai_tools_agent(llm=llm, tools=tools, prompt=iss_prompt)
+
+    # Define the Agent Executor
+    agent_executor = AgentExecutor(
+        agent=agent,
+        tools=tools,
+        max_iterations=5,
+        max_execution_time=30,
+        verbose=verbose
+    )
+
+    # Log agent initialization
+    logging.info("🚀 ISS Locator Agent initialized.")
+    return agent_executor
 
-    **FORMAT:**  
-    Thought: [Your reasoning]  
-    Action: get_iss_location_tool  
-    Action Input: {{}}  
-    Observation: [Result]  
-    Final Answer: [Answer to the User]  
-
-    **Example Query:**
-    - Where is the ISS right now?  
-      Thought: I need to find the ISS location.  
-      Action: get_iss_location_tool  
-      Action Input: {{}}  
-      Observation: [Latitude: 23.5, Longitude: -45.3]  
-      Final Answer: The ISS is currently at latitude 23.5 and longitude -45.3.  
-
-    **Begin!**
-    
-    Question: {input}
-    
-    {agent_scratchpad}
+# Example execution
+# Independent example queries - answered concurrently to show the gather speedup
+EXAMPLE_QUERIES = [
+    "Where is the ISS right now?",
+    "What are the International Space Station's current coordinates?",
+    "Is the ISS over the northern or the southern hemisphere right now?"
+]
+
+async def main():
     """
-)
+    Streams the first example answer, then runs the remaining example queries concurrently in one event loop.
+    """
+    agent_executor = build_executor()
 
-# Create the ReAct Agent
-agent = create_react_agent(
-    llm=llm,
-    tools=tools,
-    prompt=iss_prompt.partial(tool_names=tool_names, tools=tool_descriptions)
-)
+    # Stream the first answer so progress shows while the HTTP calls are in flight
+    await astream_answer(agent_executor, EXAMPLE_QUERIES[0])
 
-# Define the Agent Executor
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    handle_parsing_errors=True,
-    verbose=True,
-    max_iterations=5,
-    max_execution_time=30
-)
+    start = time.perf_counter()
+    batch = EXAMPLE_QUERIES[1:]  # The first query was already answered above
+    responses = await asyncio.gather(*(agent_executor.ainvoke({"input": query}) for query in batch))
+    logging.info(f"⏱️ Answered {len(batch)} queries concurrently in {time.perf_counter() - start:.2f}s")
 
-# Log agent initialization
-logging.info("🚀 ISS Locator Agent initialized.")
+    for response in responses:
+        print("Agent Response:", response)
 
-# Example execution
 if __name__ == "__main__":
-    query = "Where is the ISS right now?"
-    response = agent_executor.invoke({"input": query})
-    print("Agent Response:", response)
+    asyncio.run(main())
@@ -0,0 +1,15 @@
+import httpx
+from dotenv import load_dotenv
+from langchain_openai import ChatOpenAI
+
+# Load environment variables
+load_dotenv()
+
+# Define LLM with GPT-4o and low temperature - one shared client (and HTTP/2 connection pool) for every agent.
+# OpenAI only caches prompt prefixes of 1024+ tokens, which in this app means the weather agent's prompt
+llm = ChatOpenAI(
+    model="gpt-4o",
+    temperature=0.1,
+    http_client=httpx.Client(http2=True),
+    http_async_client=httpx.AsyncClient(http2=True)
+)
@@ -3,17 +3,19 @@ import logging
 import streamlit as st
 import urllib3
 from dotenv import load_dotenv
-from langchain.agents import initialize_agent, Tool
-from langchain_openai import ChatOpenAI
+from langchain.agents import AgentExecutor, Tool, create_openai_tools_agent
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from http_client import run
+from llm import llm
 
 ## IMPORT ISS LOCATOR AGENT
-from iss_locator import tools as iss_tools, iss_prompt
+from iss_locator import build_executor as build_iss_executor
 
 ## IMPORT ISS LOCATOR AGENT
-from astros import tools as astros_tools, astros_prompt
+from astros import build_executor as build_astros_executor
 
 # IMPORT THE WEATHER AGENT
-from weather import tools as weather_tools, weather_prompt
+from weather import tools as weather_tools, build_executor as build_weather_executor
 
 # ============================================================
 # **🚀 Load Environment Variables**
@@ -28,73 +30,50 @@ logging.basicConfig(level=logging.INFO)
 urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 
 # ============================================================
-# **🤖 Define the LLM**
+# **🌍 Initialize the ISS, Astros in Space and Weather Agents**
 # ============================================================
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
-
-# ============================================================
-# **🌍 Initialize the ISS Agent**
-# ============================================================
-iss_agent = initialize_agent(
-    tools=iss_tools, 
-    llm=llm, 
-    agent='zero-shot-react-description', 
-    prompt=iss_prompt, 
-    verbose=True
-)
-
-# ============================================================
-# **🌍 Initialize the Astros in Space Agent**
-# ============================================================
-astros_agent = initialize_agent(
-    tools=astros_tools, 
-    llm=llm, 
-    agent='zero-shot-react-description', 
-    prompt=astros_prompt, 
-    verbose=True
-)
-
-# ============================================================
-# **🌍 Initialize the Weather Agent**
-# ============================================================
-weather_agent = initialize_agent(
-    tools=weather_tools, 
-    llm=llm, 
-    agent='zero-shot-react-description', 
-    prompt=weather_prompt, 
-    verbose=True
-)
+# The modules cache their executors, so Streamlit reruns reuse the same ones
+# (the weather agent keeps its parallel tool-calling pipeline)
+iss_agent = build_iss_executor(verbose=True)
+astros_agent = build_astros_executor(verbose=True)
+weather_agent = build_weather_executor(verbose=True)
 
 # Define ISS Agent Function
-def iss_agent_func(input_text: str) -> str:
-    return iss_agent.invoke(f"ISS: {input_text}")
+async def iss_agent_func(input_text: str) -> str:
+    response = await iss_agent.ainvoke({"input": f"ISS: {input_text}"})
+    return response["output"]
 
 # Define Astros Agent Function
-def astros_agent_func(input_text: str) -> str:
-    return astros_agent.invoke(f"Astronauts: {input_text}")
+async def astros_agent_func(input_text: str) -> str:
+    response = await astros_agent.ainvoke({"input": f"Astronauts: {input_text}"})
+    return response["output"]
 
 # Define Astros Agent Function
-def weather_agent_func(input_text: str) -> str:
-    return weather_agent.invoke(f"Weather: {input_text}")
+async def weather_agent_func(input_text: str) -> str:
+    response = await weather_agent.ainvoke({"input": f"Weather: {input_text}"})
+    return response["output"]
 
 # Create a LangChain Tool for ISS Agent
 iss_tool = Tool(
-    name="ISS Locator",
-    func=iss_agent_func,
+    name="iss_locator",
+    func=None,
+    coroutine=iss_agent_func,
     description="Use this to retrieve information about the International Space Station (ISS)."
 )
 
 # Create a LangChain Tool for Astros Agent
 astros_tool = Tool(
-    name="Astronauts in Space",
-    func=astros_agent_func,
+    name="astronauts_in_space",
+    func=None,
+    coroutine=astros_agent_func,
     description="Use this to retrieve information about the humans in space and their spacecraft."
 )
 
 # Create a LangChain Tool for Astros Agent
 weather_tool = Tool(
-    name="The Current Weather at a location on Earth",
-    func=weather_agent_func,
+    name="weather_at_location",
+    func=None,
+    coroutine=weather_agent_func,
     description="Use this to retrieve information about the current weather at a given latitude and longitude."
 )
 
@@ -103,14 +82,26 @@ weather_tool = Tool(
 # ============================================================
 parent_tools = [iss_tool, astros_tool, *weather_tools]
 
-parent_agent = initialize_agent(
-    tools=parent_tools,
-    llm=llm,
-    agent="zero-shot-react-description",
-    verbose=True
-)
+parent_prompt = ChatPromptTemplate.from_messages([
+    ("system", "You are Space Ace, a routing agent. Answer questions about the ISS, the humans in space and the weather on Earth by calling the matching tools, then reply from their results."),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad")
+])
+
+@st.cache_resource
+def build_parent_agent():
+    """
+    Builds the routing agent once per Streamlit server instead of on every rerun.
+    """
+    agent_executor = AgentExecutor(
+        agent=create_openai_tools_agent(llm=llm, tools=parent_tools, prompt=parent_prompt),
+        tools=parent_tools,
+        verbose=True
+    )
+    logging.info(f"🚀 Main Parent Routing Agent Initialized with Tools: {[tool.name for tool in parent_tools]}")
+    return agent_executor
 
-logging.info(f"🚀 Main Parent Routing Agent Initialized with Tools: {[tool.name for tool in parent_tools]}")
+parent_agent = build_parent_agent()
 
 # ============================================================
 # **🛰️ Streamlit UI - Chat with the ISS Agent**
@@ -130,7 +121,7 @@ if st.button("Send"):
         st.warning("⚠️ Please enter a question.")
     else:
         # 🚀 Invoke the ISS Agent
-        response = parent_agent.invoke(user_input)
+        response = run(parent_agent.ainvoke({"input": user_input}))
 
         # ✅ Extract response text
         response_text = response.get("output", "No valid response received.")
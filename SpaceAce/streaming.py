@@ -0,0 +1,21 @@
+async def astream_answer(agent_executor, query):
+    """
+    Streams an agent run to stdout: model tokens as they arrive and a marker as each tool starts and resolves.
+    Returns the executor's final output dict.
+    """
+    output = None
+    async for event in agent_executor.astream_events({"input": query}, version="v2"):
+        kind = event["event"]
+        if kind == "on_chat_model_stream":
+            token = event["data"]["chunk"].content
+            if token:
+                print(token, end="", flush=True)
+        elif kind == "on_tool_start":
+            print(f"\n🔧 Calling {event['name']}…", flush=True)
+        elif kind == "on_tool_end":
+            print(f"👀 Observing {event['name']} result…", flush=True)
+        elif kind == "on_chain_end" and not event["parent_ids"]:
+            output = event["data"]["output"]  # Root run finished
+
+    print(flush=True)
+    return output
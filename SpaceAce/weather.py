@@ -1,13 +1,23 @@
 import os
-import json
 import time
+import orjson
+import asyncio
+import inspect
 import logging
-import requests
-from langchain.tools import Tool
-from langchain_openai import ChatOpenAI
-from langchain.agents import AgentExecutor, create_react_agent
-from langchain.prompts import PromptTemplate
+import datetime
+import functools
+import httpx
+from langchain.tools import StructuredTool
+from langchain.agents import AgentExecutor
+from langchain.agents.format_scratchpad.tools import format_to_tool_messages
+from langchain.agents.output_parsers.tools import ToolsAgentOutputParser
+from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
+from langchain_core.runnables import RunnablePassthrough
 from dotenv import load_dotenv
+from http_client import client, get_with_retry
+from cache import ttl_cache
+from llm import llm
+from streaming import astream_answer
 
 # Load environment variables
 load_dotenv()
@@ -21,6 +31,32 @@ logging.basicConfig(level=logging.INFO)
 
 BASE_API_URL = "https://api.weatherapi.com/v1"
 
+# Max concurrent requests to WeatherAPI - stays under its rate limits
+_WEATHER_SEM = asyncio.Semaphore(8)
+
+# Cache lifetime in seconds per endpoint - live conditions go stale quickly, past days and sun/moon times do not
+WEATHER_CACHE_TTL = {
+    "current": 300,
+    "forecast": 300,
+    "marine": 300,
+    "timezone": 3600,
+    "history": 3600,
+    "astronomy": 3600
+}
+
+
+def weather_cache_key(_self, endpoint, params):
+    """
+    Builds a cache key from the endpoint, the coordinates rounded to 2 decimals (~1 km) and the date/days parameters.
+    """
+    coordinates = []
+    for value in params["q"].split(","):
+        try:
+            coordinates.append(round(float(value), 2))
+        except ValueError:
+            coordinates.append(value)
+    return (endpoint, *coordinates, params.get("dt"), params.get("days"))
+
 # ---------------------------- API CLASS ---------------------------- #
 class WeatherAPI:
     """
@@ -28,52 +64,101 @@ class WeatherAPI:
     """
     def __init__(self):
         self.api_key = WEATHER_API_KEY
+        self.client = client  # Shared keep-alive pool
 
-    def fetch_data(self, endpoint, params):
+    @ttl_cache(
+        ttl=lambda _self, endpoint, _params: WEATHER_CACHE_TTL.get(endpoint, 300),
+        key=weather_cache_key
+    )
+    async def fetch_data(self, endpoint, params):
         """
         Generic function to query any WeatherAPI endpoint.
         """
         url = f"{BASE_API_URL}/{endpoint}.json"
         params["key"] = self.api_key
 
-        retries = 3  # Retry mechanism
-        for attempt in range(retries):
-            try:
-                logging.debug(f"Fetching data from {url} with params {params}")
-                response = requests.get(url, params=params, timeout=5)
-                response.raise_for_status()
-                return response.json()
-            except requests.exceptions.RequestException as e:
-                logging.error(f"API request failed (Attempt {attempt+1}): {e}")
-                time.sleep(2)
-
-        return {"error": f"Failed to fetch data from {endpoint} after multiple attempts."}
+        try:
+            logging.debug(f"Fetching data from {url} with params {params}")
+            return await get_with_retry(self.client, url, params, semaphore=_WEATHER_SEM)
+        except httpx.HTTPError:
+            return {"error": f"Failed to fetch data from {endpoint} after multiple attempts."}
 
     # Current Weather
-    def get_weather(self, latitude, longitude):
-        return self.fetch_data("current", {"q": f"{latitude},{longitude}"})
+    async def get_weather(self, latitude, longitude):
+        return await self.fetch_data("current", {"q": f"{latitude},{longitude}"})
 
     # Forecast Weather
-    def get_forecast(self, latitude, longitude, days=3):
-        return self.fetch_data("forecast", {"q": f"{latitude},{longitude}", "days": days})
+    async def get_forecast(self, latitude, longitude, days=3):
+        return await self.fetch_data("forecast", {"q": f"{latitude},{longitude}", "days": days})
 
     # Historical Weather
-    def get_history(self, latitude, longitude, date):
-        return self.fetch_data("history", {"q": f"{latitude},{longitude}", "dt": date})
+    async def get_history(self, latitude, longitude, date):
+        return await self.fetch_data("history", {"q": f"{latitude},{longitude}", "dt": date})
 
     # Marine Weather
-    def get_marine(self, latitude, longitude):
-        return self.fetch_data("marine", {"q": f"{latitude},{longitude}"})
+    async def get_marine(self, latitude, longitude):
+        return await self.fetch_data("marine", {"q": f"{latitude},{longitude}"})
 
     # Timezone Data
-    def get_timezone(self, latitude, longitude):
-        return self.fetch_data("timezone", {"q": f"{latitude},{longitude}"})
+    async def get_timezone(self, latitude, longitude):
+        return await self.fetch_data("timezone", {"q": f"{latitude},{longitude}"})
 
     # Astronomy Data
-    def get_astronomy(self, latitude, longitude, date):
-        return self.fetch_data("astronomy", {"q": f"{latitude},{longitude}", "dt": date})
+    async def get_astronomy(self, latitude, longitude, date):
+        return await self.fetch_data("astronomy", {"q": f"{latitude},{longitude}", "dt": date})
+
+# Shared instance used by every tool - avoids re-reading the env and keeps connections warm
+_WEATHER = WeatherAPI()
 
 # ---------------------------- TOOL FUNCTIONS ---------------------------- #
+@functools.lru_cache(maxsize=256)
+def parse_coordinates(latitude, longitude):
+    """
+    Parses latitude/longitude strings into floats.
+    Returns (latitude, longitude, None), or (None, None, error message) if they are not numbers within range.
+    """
+    try:
+        if "_" in latitude or "_" in longitude:
+            raise ValueError("digit separators")  # float() accepts "1_0", WeatherAPI does not
+        lat = float(latitude)
+        lon = float(longitude)
+    except ValueError:
+        return None, None, "Latitude and longitude must be numbers."
+
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return None, None, "Latitude must be between -90 and 90 and longitude between -180 and 180."
+    return lat, lon, None
+
+
+@functools.lru_cache(maxsize=256)
+def parse_date(date):
+    """
+    Parses an ISO date string.
+    Returns ('YYYY-MM-DD', None), or (None, error message) if it is not a valid date.
+    """
+    try:
+        return datetime.date.fromisoformat(date).isoformat(), None
+    except ValueError:
+        return None, "Invalid 'date' field. Expected YYYY-MM-DD."
+
+
+def parse_days(days):
+    """
+    Parses the forecast length.
+    Returns (days, None), or (None, error message) if it is not a positive whole number.
+    """
+    if isinstance(days, int) and not isinstance(days, bool):
+        value = days
+    elif isinstance(days, str) and days.strip().isdecimal():
+        value = int(days)
+    else:
+        return None, "Invalid 'days' field. Expected a positive whole number."
+
+    if value < 1:
+        return None, "Invalid 'days' field. Expected a positive whole number."
+    return value, None
+
+
 def parse_input(input_data):
     """
     Ensures input_data is a dictionary.
@@ -82,137 +167,196 @@ def parse_input(input_data):
     try:
         if isinstance(input_data, str):  
             logging.debug(f"Parsing input string: {input_data}")
-            input_data = json.loads(input_data)  # Convert JSON string to dictionary
+            input_data = orjson.loads(input_data)  # Convert JSON string to dictionary
 
         if not isinstance(input_data, dict):
             logging.error(f"Invalid input type: {type(input_data)}. Expected dict.")
             return {"error": "Invalid input format. Expected JSON object."}
 
-        logging.debug(f"Received input data: {input_data}")
-        return input_data
-
-    except json.JSONDecodeError as e:
+        # Reject bad values here instead of paying for a round trip that can only return 400
+        if "latitude" not in input_data or "longitude" not in input_data:
+            return {"error": "Missing 'latitude' or 'longitude' field."}
+
+        # Forward the parsed values, not the raw strings, so upstream always gets canonical input
+        parsed = dict(input_data)
+        parsed["latitude"], parsed["longitude"], error = parse_coordinates(
+            str(input_data["latitude"]), str(input_data["longitude"])
+        )
+        if error is None and "date" in input_data:
+            parsed["date"], error = parse_date(str(input_data["date"]))
+        if error is None and "days" in input_data:
+            parsed["days"], error = parse_days(input_data["days"])
+        if error:
+            logging.error(f"Invalid input values: {input_data} ({error})")
+            return {"error": error}
+
+        logging.debug(f"Received input data: {parsed}")
+        return parsed
+
+    except orjson.JSONDecodeError as e:
         logging.error(f"JSON parsing error: {e}")
         return {"error": "Invalid JSON format."}
 
 
-def get_current_weather(input_data):
+async def get_current_weather(latitude: float, longitude: float):
     """
     Fetches real-time weather based on latitude/longitude.
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude})
     if "error" in input_data:
         return input_data  # Return error message
 
-    weather_client = WeatherAPI()
-    return weather_client.get_weather(input_data["latitude"], input_data["longitude"])
+    return await _WEATHER.get_weather(input_data["latitude"], input_data["longitude"])
 
 
-def get_forecast_weather(input_data):
+async def get_forecast_weather(latitude: float, longitude: float, days: int = 3):
     """
-    Fetches weather forecast for a given location.
-    Expects {'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy', 'days': 3}
+    Fetches weather forecast for a given location over a number of days.
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude, "days": days})
     if "error" in input_data:
         return input_data  # Return error message
 
-    weather_client = WeatherAPI()
-    return weather_client.get_forecast(input_data["latitude"], input_data["longitude"], input_data.get("days", 3))
+    return await _WEATHER.get_forecast(input_data["latitude"], input_data["longitude"], input_data["days"])
 
 
-def get_historical_weather(input_data):
+async def get_historical_weather(latitude: float, longitude: float, date: str):
     """
-    Fetches past weather for a given date.
-    Expects {'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy', 'date': 'YYYY-MM-DD'}
+    Fetches past weather for a given date (YYYY-MM-DD).
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude, "date": date})
     if "error" in input_data:
         return input_data  # Return error message
 
-    if "date" not in input_data:
-        return {"error": "Missing 'date' field."}
-
-    weather_client = WeatherAPI()
-    return weather_client.get_history(input_data["latitude"], input_data["longitude"], input_data["date"])
+    return await _WEATHER.get_history(input_data["latitude"], input_data["longitude"], input_data["date"])
 
 
-def get_marine_weather(input_data):
+async def get_marine_weather(latitude: float, longitude: float):
     """
     Fetches marine weather data for a given location.
-    Expects {'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy'}
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude})
     if "error" in input_data:
         return input_data  # Return error message
 
-    weather_client = WeatherAPI()
-    return weather_client.get_marine(input_data["latitude"], input_data["longitude"])
+    return await _WEATHER.get_marine(input_data["latitude"], input_data["longitude"])
 
 
-def get_timezone_info(input_data):
+async def get_timezone_info(latitude: float, longitude: float):
     """
     Fetches timezone information for a given location.
-    Expects {'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy'}
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude})
     if "error" in input_data:
         return input_data  # Return error message
 
-    weather_client = WeatherAPI()
-    return weather_client.get_timezone(input_data["latitude"], input_data["longitude"])
+    return await _WEATHER.get_timezone(input_data["latitude"], input_data["longitude"])
 
 
-def get_astronomy_info(input_data):
+async def get_astronomy_info(latitude: float, longitude: float, date: str):
     """
-    Fetches astronomical data for a given date.
-    Expects {'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy', 'date': 'YYYY-MM-DD'}
+    Fetches astronomical data for a given date (YYYY-MM-DD).
     """
-    input_data = parse_input(input_data)
+    input_data = parse_input({"latitude": latitude, "longitude": longitude, "date": date})
     if "error" in input_data:
         return input_data  # Return error message
 
-    if "date" not in input_data:
-        return {"error": "Missing 'date' field."}
+    return await _WEATHER.get_astronomy(input_data["latitude"], input_data["longitude"], input_data["date"])
+
+# ---------------------------- PLAN TOOL ---------------------------- #
+# Step names a plan may use, mapped to the tool functions (which validate their own arguments)
+PLAN_STEPS = {
+    "get_weather": get_current_weather,
+    "get_forecast": get_forecast_weather,
+    "get_history": get_historical_weather,
+    "get_marine": get_marine_weather,
+    "get_timezone": get_timezone_info,
+    "get_astronomy": get_astronomy_info
+}
+
+MAX_PLAN_STEPS = 12  # Caps the fan-out of a single plan
+
 
-    weather_client = WeatherAPI()
-    return weather_client.get_astronomy(input_data["latitude"], input_data["longitude"], input_data["date"])
+async def run_weather_plan(steps: list[dict]):
+    """
+    Runs a declarative plan of WeatherAPI lookups concurrently in one tool turn.
+    Expects steps such as [{'tool': 'get_weather', 'latitude': 'xx.xxxx', 'longitude': 'yy.yyyy'}]
+    and returns one {'tool': ..., 'result': ...} entry per step, in order.
+    """
+    if not steps:
+        return {"error": "Invalid plan format. Expected a non-empty list of steps."}
+    if len(steps) > MAX_PLAN_STEPS:
+        return {"error": f"Too many steps in plan. The limit is {MAX_PLAN_STEPS}."}
+
+    calls = []
+    for index, step in enumerate(steps):
+        if not isinstance(step.get("tool"), str) or step["tool"] not in PLAN_STEPS:
+            return {"error": f"Invalid step {index + 1}. 'tool' must be one of: {', '.join(PLAN_STEPS)}."}
+
+        func = PLAN_STEPS[step["tool"]]
+        args = {key: value for key, value in step.items() if key != "tool"}
+        try:
+            inspect.signature(func).bind(**args)  # Missing or unknown fields
+        except TypeError as e:
+            return {"error": f"Invalid step {index + 1}: {e}."}
+        calls.append(func(**args))
+
+    results = await asyncio.gather(*calls)
+    return [{"tool": step["tool"], "result": result} for step, result in zip(steps, results)]
 
 # ---------------------------- LANGCHAIN TOOLS ---------------------------- #
-get_weather_tool = Tool(
+# Typed tools - the model sends structured arguments and validation errors go back to it as text
+get_weather_tool = StructuredTool.from_function(
     name="fetch_weather",
     description="Fetches the current weather at a given latitude and longitude.",
-    func=get_current_weather
+    coroutine=get_current_weather,
+    handle_validation_error=True
 )
 
-get_forecast_tool = Tool(
+get_forecast_tool = StructuredTool.from_function(
     name="fetch_forecast",
-    description="Fetches weather forecast for a given location.",
-    func=get_forecast_weather
+    description="Fetches weather forecast for a given location over a number of days.",
+    coroutine=get_forecast_weather,
+    handle_validation_error=True
 )
 
-get_history_tool = Tool(
+get_history_tool = StructuredTool.from_function(
     name="fetch_history",
-    description="Fetches past weather for a given date.",
-    func=get_historical_weather
+    description="Fetches past weather for a given date (YYYY-MM-DD).",
+    coroutine=get_historical_weather,
+    handle_validation_error=True
 )
 
-get_marine_tool = Tool(
+get_marine_tool = StructuredTool.from_function(
     name="fetch_marine",
     description="Fetches marine weather data for a given location.",
-    func=get_marine_weather
+    coroutine=get_marine_weather,
+    handle_validation_error=True
 )
 
-get_timezone_tool = Tool(
+get_timezone_tool = StructuredTool.from_function(
     name="fetch_timezone",
     description="Fetches timezone information for a given location.",
-    func=get_timezone_info
+    coroutine=get_timezone_info,
+    handle_validation_error=True
 )
 
-get_astronomy_tool = Tool(
+get_astronomy_tool = StructuredTool.from_function(
     name="fetch_astronomy",
-    description="Fetches astronomical data for a given date and location.",
-    func=get_astronomy_info
+    description="Fetches astronomical data for a given date (YYYY-MM-DD) and location.",
+    coroutine=get_astronomy_info,
+    handle_validation_error=True
+)
+
+get_plan_tool = StructuredTool.from_function(
+    name="run_weather_plan",
+    description=(
+        "Runs several weather lookups concurrently in one step. "
+        "'steps' is a list of objects, each with a 'tool' (get_weather, get_forecast, get_history, "
+        "get_marine, get_timezone or get_astronomy) plus 'latitude', 'longitude' and any 'days' or 'date' it needs."
+    ),
+    coroutine=run_weather_plan,
+    handle_validation_error=True
 )
 
 # Register all tools in a list
@@ -222,22 +366,17 @@ tools = [
     get_history_tool,
     get_marine_tool,
     get_timezone_tool,
-    get_astronomy_tool
+    get_astronomy_tool,
+    get_plan_tool
 ]
 
-tool_names = ", ".join([tool.name for tool in tools])
-
-tool_descriptions = "\n".join([f"{tool.name}: {tool.description}" for tool in tools])
-
-# ---------------------------- LLM & PROMPT TEMPLATE ---------------------------- #
-llm = ChatOpenAI(model_name="gpt-4o", temperature=0.1)
-
-weather_prompt = PromptTemplate(
-    input_variables=["input", "agent_scratchpad"],
-    template="""
+# ---------------------------- PROMPT TEMPLATE ---------------------------- #
+# Static instructions come first as one system message - with the tool schemas they pass 1024 tokens, so repeat calls hit the prompt cache
+weather_prompt = ChatPromptTemplate.from_messages([
+    ("system", """
     You are a Weather AI Agent that provides real-time weather conditions, forecasts, historical data, marine conditions, timezone information, and astronomical data based on a given latitude and longitude.
 
-    You have access to six tools:
+    You have access to seven tools:
 
     - **fetch_weather**: Fetches the current weather at a given latitude and longitude.
     - **fetch_forecast**: Retrieves the weather forecast for a location over a number of days.
@@ -245,93 +384,121 @@ weather_prompt = PromptTemplate(
     - **fetch_marine**: Retrieves marine and ocean weather conditions.
     - **fetch_timezone**: Retrieves timezone information for a given location.
     - **fetch_astronomy**: Retrieves astronomical data (sunrise, sunset, moon phases) for a location and date.
+    - **run_weather_plan**: Runs several of the lookups above concurrently in one step.
+
+    The fetch_* tools take "latitude" and "longitude" as numbers, plus "days" (fetch_forecast) or "date" as YYYY-MM-DD (fetch_history, fetch_astronomy).
 
-    **FORMAT:**
-    Thought: [Your reasoning]  
-    Action: [Correct tool to use]  
-    Action Input: {{ "latitude": "xx.xxxx", "longitude": "yy.yyyy", "optional_parameters": "..." }}  
-    Observation: [Result]  
-    Final Answer: [Formatted response based on the retrieved data]  
+    **Multi-step questions:** When a question needs more than one lookup (different datasets, or several locations), PREFER a single **run_weather_plan** call.
+    Its "steps" argument is a list of objects. Each step names a "tool" (get_weather, get_forecast, get_history, get_marine, get_timezone or get_astronomy) and carries the same "latitude", "longitude", "days" or "date" fields the matching fetch_* tool takes. All steps run at once and the results come back in step order.
+    If you do not use a plan, request ALL independent fetch_* calls in the same turn so they run in parallel. Either way, write one final answer from the combined results.
 
     **Example Queries and How to Use the Correct Tools:**
 
     **1️⃣ Current Weather Query**
     - *Question*: What is the weather like at latitude 23.5 and longitude -45.3?  
-      Thought: I need to fetch the current weather for that location.  
-      Action: fetch_weather  
-      Action Input: {{ "latitude": "23.5", "longitude": "-45.3" }}  
-      Observation: [Weather details]  
+      Tool calls: fetch_weather {{ "latitude": 23.5, "longitude": -45.3 }}  
       Final Answer: The current temperature is 24°C with partly cloudy skies.  
 
     **2️⃣ Weather Forecast Query**
     - *Question*: What is the 5-day forecast for Paris?  
-      Thought: I need to get the weather forecast for Paris over the next 5 days.  
-      Action: fetch_forecast  
-      Action Input: {{ "latitude": "48.8566", "longitude": "2.3522", "days": 5 }}  
-      Observation: [Forecast data]  
+      Tool calls: fetch_forecast {{ "latitude": 48.8566, "longitude": 2.3522, "days": 5 }}  
       Final Answer: Over the next 5 days, Paris will see rain on Tuesday, sunny skies on Wednesday, and cloudy weather the rest of the week.  
 
     **3️⃣ Historical Weather Query**
     - *Question*: What was the weather like in New York on January 1, 2023?  
-      Thought: I need to fetch historical weather data for New York on 2023-01-01.  
-      Action: fetch_history  
-      Action Input: {{ "latitude": "40.71", "longitude": "-74.01", "date": "2023-01-01" }}  
-      Observation: [Historical weather data]  
+      Tool calls: fetch_history {{ "latitude": 40.71, "longitude": -74.01, "date": "2023-01-01" }}  
       Final Answer: On January 1, 2023, New York had a temperature of 5°C with light rain.  
 
     **4️⃣ Marine Weather Query**
     - *Question*: What is the marine forecast for the Gulf of Mexico?  
-      Thought: I need to retrieve marine weather data for the Gulf of Mexico.  
-      Action: fetch_marine  
-      Action Input: {{ "latitude": "25.0", "longitude": "-90.0" }}  
-      Observation: [Marine conditions]  
+      Tool calls: fetch_marine {{ "latitude": 25.0, "longitude": -90.0 }}  
       Final Answer: The Gulf of Mexico has waves of 1.5 meters with moderate winds from the southeast.  
 
     **5️⃣ Timezone Information Query**
     - *Question*: What is the timezone for Tokyo?  
-      Thought: I need to retrieve timezone data for Tokyo.  
-      Action: fetch_timezone  
-      Action Input: {{ "latitude": "35.6895", "longitude": "139.6917" }}  
-      Observation: [Timezone details]  
+      Tool calls: fetch_timezone {{ "latitude": 35.6895, "longitude": 139.6917 }}  
       Final Answer: The timezone for Tokyo is JST (Japan Standard Time), UTC+9.  
 
     **6️⃣ Astronomy Query**
     - *Question*: When is the sunrise and sunset in Los Angeles on July 4, 2025?  
-      Thought: I need to retrieve astronomical data for Los Angeles on 2025-07-04.  
-      Action: fetch_astronomy  
-      Action Input: {{ "latitude": "34.05", "longitude": "-118.25", "date": "2025-07-04" }}  
-      Observation: [Sunrise/Sunset details]  
+      Tool calls: fetch_astronomy {{ "latitude": 34.05, "longitude": -118.25, "date": "2025-07-04" }}  
       Final Answer: On July 4, 2025, the sunrise in Los Angeles will be at 5:48 AM and sunset at 8:12 PM.  
 
-    **Begin!**
+    **7️⃣ Combined Query**
+    - *Question*: What is the weather, timezone and sunrise in Tokyo on July 4, 2025?  
+      Tool calls (same turn):  
+        fetch_weather {{ "latitude": 35.6895, "longitude": 139.6917 }}  
+        fetch_timezone {{ "latitude": 35.6895, "longitude": 139.6917 }}  
+        fetch_astronomy {{ "latitude": 35.6895, "longitude": 139.6917, "date": "2025-07-04" }}  
+      Final Answer: Tokyo is 27°C and sunny, on JST (UTC+9), and the sun rises at 4:32 AM on July 4, 2025.  
+
+    **8️⃣ Plan Query**
+    - *Question*: Compare the weather in Seattle and Amsterdam and tell me the sunrise in both on July 4, 2025.  
+      Tool calls: run_weather_plan  
+        {{ "steps": [
+            {{ "tool": "get_weather", "latitude": 47.61, "longitude": -122.33 }},
+            {{ "tool": "get_weather", "latitude": 52.37, "longitude": 4.90 }},
+            {{ "tool": "get_astronomy", "latitude": 47.61, "longitude": -122.33, "date": "2025-07-04" }},
+            {{ "tool": "get_astronomy", "latitude": 52.37, "longitude": 4.90, "date": "2025-07-04" }}
+        ] }}  
+      Final Answer: Seattle is 18°C and overcast while Amsterdam is 21°C and sunny. On July 4, 2025 the sun rises at 5:16 AM in Seattle and 5:22 AM in Amsterdam.  
+    """),
+    ("human", "{input}"),
+    MessagesPlaceholder(variable_name="agent_scratchpad")
+])
+
+@functools.lru_cache(maxsize=None)
+def build_executor(verbose=False):
+    """
+    Builds the tool-calling agent and its executor once per `verbose` setting; later calls return the cached executor.
+    """
+    # Create the Tool-Calling Agent (parallel tool calls are returned in a single model turn)
+    agent = (
+        RunnablePassthrough.assign(
+            agent_scratchpad=lambda x: format_to_tool_messages(x["intermediate_steps"])
+        )
+        | weather_prompt
+        | llm.bind_tools(tools, parallel_tool_calls=True)
+        | ToolsAgentOutputParser()
+    )
+
+    # AgentExecutor.ainvoke runs every tool call from the same turn concurrently via asyncio.gather
+    agent_executor = AgentExecutor(
+        agent=agent,
+        tools=tools,
+        max_iterations=5,
+        max_execution_time=30,
+        verbose=verbose
+    )
+
+    # Log initialization
+    logging.info("🚀 Weather Agent initialized.")
+    return agent_executor
 
-    Question: {input}
+# ---------------------------- TEST EXECUTION ---------------------------- #
+# Independent example queries - answered concurrently to show the gather speedup
+EXAMPLE_QUERIES = [
+    {"latitude": "23.5", "longitude": "-45.3"},
+    "What is the timezone for Tokyo?",
+    "Compare the weather in Seattle and Amsterdam right now."
+]
 
-    {agent_scratchpad}
+async def main():
     """
-)
+    Streams the first example answer, then runs the remaining example queries concurrently in one event loop.
+    """
+    agent_executor = build_executor()
 
-# Create the ReAct Agent
-agent = create_react_agent(
-    llm=llm,
-    tools=tools,
-    prompt=weather_prompt.partial(tool_names=tool_names, tools=tool_descriptions)
-)
+    # Stream the first answer so progress shows while the HTTP calls are in flight
+    await astream_answer(agent_executor, EXAMPLE_QUERIES[0])
 
-agent_executor = AgentExecutor(
-    agent=agent,
-    tools=tools,
-    handle_parsing_errors=True,
-    verbose=True,
-    max_iterations=5,
-    max_execution_time=30
-)
+    start = time.perf_counter()
+    batch = EXAMPLE_QUERIES[1:]  # The first query was already answered above
+    responses = await asyncio.gather(*(agent_executor.ainvoke({"input": query}) for query in batch))
+    logging.info(f"⏱️ Answered {len(batch)} queries concurrently in {time.perf_counter() - start:.2f}s")
 
-# Log initialization
-logging.info("🚀 Weather Agent initialized.")
+    for response in responses:
+        print("Weather Agent Response:", response)
 
-# ---------------------------- TEST EXECUTION ---------------------------- #
 if __name__ == "__main__":
-    test_input = {"latitude": "23.5", "longitude": "-45.3"}
-    response = agent_executor.invoke({"input": test_input})
-    print("Weather Agent Response:", response)
+    asyncio.run(main())